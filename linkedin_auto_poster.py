@@ -5,26 +5,90 @@ Monitors Squarespace RSS, generates LinkedIn posts with Claude AI,
 and automatically posts to LinkedIn with intelligent variant selection.
 """
 
-import feedparser
+import atexit
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import os
-import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import hashlib
+import html
+import re
+import threading
+import xml.etree.ElementTree as ET
+
+import semantic_cache
 
 # Configuration - Set these as environment variables in Railway
 SQUARESPACE_RSS_URL = os.getenv("SQUARESPACE_RSS_URL", "")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 LINKEDIN_EMAIL = os.getenv("LINKEDIN_EMAIL", "")
 LINKEDIN_PASSWORD = os.getenv("LINKEDIN_PASSWORD", "")
+# LinkedIn API (preferred) - OAuth2 token with w_member_social, and the
+# author URN to post as, e.g. urn:li:person:abc123
+LINKEDIN_ACCESS_TOKEN = os.getenv("LINKEDIN_ACCESS_TOKEN", "")
+LINKEDIN_AUTHOR_URN = os.getenv("LINKEDIN_AUTHOR_URN", "")
+# Post through headless Chrome when the API isn't provisioned
+USE_SELENIUM_FALLBACK = os.getenv("USE_SELENIUM_FALLBACK", "").lower() in ("1", "true", "yes")
+# Chrome profile kept between runs so the LinkedIn session cookie survives
+CHROME_PROFILE_DIR = os.getenv("CHROME_PROFILE_DIR", str(Path.home() / ".li-autoposter-chrome"))
 
 # Tracking
 POSTED_CACHE_FILE = Path("posted_articles.json")
+POSTED_LOG_FILE = Path("posted_articles.jsonl")
+COMPACT_MIN_LOG_LINES = 50
+FEED_STATE_FILE = Path("feed_state.json")
 LOG_DIR = Path("logs")
 LOG_DIR.mkdir(exist_ok=True)
 
+# Shared HTTP session - keeps TLS connections to the feed and Anthropic alive.
+# Retries cover refused connections (nothing was sent) and 429/5xx responses
+# only - never read timeouts, which would re-send a billed Claude generation.
+SESSION = requests.Session()
+_retry = Retry(
+    total=3,
+    connect=3,
+    read=0,
+    other=0,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=['GET', 'POST']
+)
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=_retry)
+SESSION.mount('https://', _adapter)
+SESSION.mount('http://', _adapter)
+# Never retry LinkedIn writes - a retried POST could publish the post twice
+SESSION.mount('https://api.linkedin.com', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+
+# Feed parsing - RSS 2.0 <item> and Atom <entry>
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+RSS_CONTENT_TAG = "{http://purl.org/rss/1.0/modules/content/}encoded"
+FEED_ENTRY_TAGS = ('item', f"{ATOM_NS}entry")
+
+# HTML cleanup
+_TAG_RE = re.compile(r'<[^>]+>')
+_WS_RE = re.compile(r'\s+')
+
+# Blog content sent to Claude. Markup typically inflates text ~4x, so cleaning
+# the first 4x chars of raw HTML still leaves enough clean text to fill the prompt.
+PROMPT_CONTENT_CHARS = 3000
+RAW_CONTENT_CHARS = PROMPT_CONTENT_CHARS * 4
+
+# Claude variant generation. Three captions with hashtags and notes come to
+# roughly 1000 output tokens, so this only trims runaway responses.
+ANTHROPIC_MESSAGES_URL = 'https://api.anthropic.com/v1/messages'
+CLAUDE_MAX_TOKENS = 1500
+
+# Fast JSON encode/decode - falls back to the stdlib json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # LinkedIn posting via browser automation
 try:
     from selenium import webdriver
@@ -33,40 +97,246 @@ try:
     from selenium.webdriver.support import expected_conditions as EC
     from selenium.webdriver.chrome.options import Options
     from selenium.webdriver.chrome.service import Service
+    from selenium.common.exceptions import TimeoutException
     SELENIUM_AVAILABLE = True
+    
+    START_POST_LOCATOR = (By.CSS_SELECTOR, 'button[aria-label*="Start a post"]')
 except ImportError:
     SELENIUM_AVAILABLE = False
     print("⚠️  Selenium not installed - LinkedIn posting disabled")
 
 
+# Static instructions for variant generation, sent as a system block marked with
+# cache_control. At ~400 tokens this is below Sonnet's 1024-token cacheable
+# minimum, so the marker is currently inert and the block is billed in full on
+# every call. It starts caching on its own only if the prompt grows past that.
+VARIANT_SYSTEM_PROMPT = """You are an expert LinkedIn content strategist for Steven, an Education Director with 25+ years in special education leadership, recently completed Ed.D., and building a Human-First AI Leadership platform.
+
+Generate 3 distinct LinkedIn caption variations for this blog post. Each should be engagement-optimized but authentic to Steven's voice.
+
+**OPTIMIZATION FRAMEWORK:**
+
+1. **Personal Story Hook** - Lead with Steven's experience
+2. **Question Pattern Interrupt** - Start with provocative question  
+3. **Contrarian/Stat Hook** - Challenge common assumption
+
+**REQUIREMENTS:**
+- Hook that stops the scroll
+- Mini-insight that provides value
+- Natural flow (not salesy)
+- 3-5 strategic hashtags
+- NO link in caption (will be added in comments)
+
+**STEVEN'S VOICE:**
+- Thoughtful, authentic educator
+- Challenges conventional wisdom
+- Purpose-driven leadership focus
+- Integrates AI + human dignity
+
+**OUTPUT FORMAT (CRITICAL):**
+Return ONLY valid JSON with no markdown, no preamble, no explanation:
+
+{
+  "variants": [
+    {
+      "type": "personal_story",
+      "caption": "full caption text here",
+      "hashtags": ["tag1", "tag2", "tag3"],
+      "engagement_score": 85,
+      "why_it_works": "brief explanation"
+    },
+    {
+      "type": "question_interrupt", 
+      "caption": "full caption text here",
+      "hashtags": ["tag1", "tag2", "tag3"],
+      "engagement_score": 90,
+      "why_it_works": "brief explanation"
+    },
+    {
+      "type": "contrarian_hook",
+      "caption": "full caption text here", 
+      "hashtags": ["tag1", "tag2", "tag3"],
+      "engagement_score": 88,
+      "why_it_works": "brief explanation"
+    }
+  ]
+}
+"""
+
+# Per-post part of the prompt, filled in with str.format for each blog post
+VARIANT_USER_PROMPT_TEMPLATE = """**BLOG POST:**
+
+Title: {title}
+Content: {content}
+URL: {url}
+
+---
+
+Return ONLY the JSON object, nothing else:"""
+
+
+# Today's log file, kept open between log() calls. log() runs on both the main
+# thread and the Chrome warm-up thread, so reopen-and-write holds _LOG_LOCK.
+_LOG_FH = None
+_LOG_FH_PATH = None
+_LOG_LOCK = threading.Lock()
+
+
+def _get_log_file(now):
+    """Return the handle for today's log file, reopening when the date rolls over"""
+    global _LOG_FH, _LOG_FH_PATH
+    log_file = LOG_DIR / f"autopost_{now.strftime('%Y%m%d')}.log"
+    if log_file != _LOG_FH_PATH:
+        if _LOG_FH is not None:
+            _LOG_FH.close()
+        _LOG_FH = open(log_file, 'a', buffering=1, encoding='utf-8')
+        _LOG_FH_PATH = log_file
+    return _LOG_FH
+
+
+def _close_log_file():
+    """Flush and close the log file at interpreter exit"""
+    with _LOG_LOCK:
+        if _LOG_FH is not None:
+            _LOG_FH.close()
+
+
+atexit.register(_close_log_file)
+
+
 def log(message):
     """Log with timestamp"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_message = f"[{timestamp}] {message}"
+    now = datetime.now()
+    log_message = f"[{now.strftime('%Y-%m-%d %H:%M:%S')}] {message}"
     print(log_message)
     
     # Write to log file
-    log_file = LOG_DIR / f"autopost_{datetime.now().strftime('%Y%m%d')}.log"
-    with open(log_file, 'a', encoding='utf-8') as f:
-        f.write(log_message + "\n")
+    with _LOG_LOCK:
+        _get_log_file(now).write(log_message + "\n")
+
+
+def json_loads(data):
+    """Decode JSON with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj, indent=False):
+    """Encode JSON to str with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode('utf-8')
+    return json.dumps(obj, indent=2 if indent else None)
+
+
+def write_file_atomic(path, text):
+    """Write text via a temp file and rename, so a crash never leaves a partial file"""
+    tmp_file = path.with_name(path.name + '.tmp')
+    tmp_file.write_text(text, encoding='utf-8')
+    os.replace(tmp_file, path)
 
 
 def get_article_hash(url):
     """Generate unique hash for article URL"""
-    return hashlib.md5(url.encode()).hexdigest()
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=8).hexdigest()
+
+
+# In-memory copy of the posted cache, reloaded only when its files change on disk
+_POSTED_CACHE = None
+_POSTED_CACHE_MTIME = None
+_POSTED_LOG_LINES = 0
+
+
+def _posted_files_mtime():
+    """Modification times of the posted snapshot and append log"""
+    mtimes = []
+    for path in (POSTED_CACHE_FILE, POSTED_LOG_FILE):
+        try:
+            mtimes.append(path.stat().st_mtime_ns)
+        except FileNotFoundError:
+            mtimes.append(None)
+    return tuple(mtimes)
 
 
 def load_posted_articles():
     """Load list of already posted articles"""
+    global _POSTED_LOG_LINES
+    
+    posted = {}
     if POSTED_CACHE_FILE.exists():
-        with open(POSTED_CACHE_FILE, 'r') as f:
-            return json.load(f)
-    return {}
+        posted = json_loads(POSTED_CACHE_FILE.read_text(encoding='utf-8'))
+    
+    # Replay saves appended since the last compaction
+    _POSTED_LOG_LINES = 0
+    if POSTED_LOG_FILE.exists():
+        with open(POSTED_LOG_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json_loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn line from an interrupted append
+                posted[record.pop('hash')] = record
+                _POSTED_LOG_LINES += 1
+    
+    return posted
+
+
+def _write_posted_articles(posted):
+    """Atomically rewrite the posted snapshot and clear the append log"""
+    global _POSTED_CACHE_MTIME, _POSTED_LOG_LINES
+    
+    write_file_atomic(POSTED_CACHE_FILE, json_dumps(posted, indent=True))
+    
+    # Everything in the log is now in the snapshot (replaying it is harmless)
+    POSTED_LOG_FILE.unlink(missing_ok=True)
+    _POSTED_LOG_LINES = 0
+    _POSTED_CACHE_MTIME = _posted_files_mtime()
+
+
+def _migrate_article_hashes(posted):
+    """Re-key entries stored under an older hash scheme (e.g. MD5)"""
+    migrated = {}
+    for article_hash, info in posted.items():
+        url = info.get('url')
+        migrated[get_article_hash(url) if url else article_hash] = info
+    return migrated
+
+
+def _get_posted():
+    """Return the cached posted-articles dict, loading it from disk on first use"""
+    global _POSTED_CACHE, _POSTED_CACHE_MTIME
+    
+    mtime = _posted_files_mtime()
+    
+    # Reload only if the files were changed by someone else since we last read them
+    if _POSTED_CACHE is None or mtime != _POSTED_CACHE_MTIME:
+        _POSTED_CACHE = load_posted_articles()
+        _POSTED_CACHE_MTIME = mtime
+        
+        migrated = _migrate_article_hashes(_POSTED_CACHE)
+        if migrated.keys() != _POSTED_CACHE.keys():
+            log("🔁 Migrating posted cache to new article hash format")
+            _POSTED_CACHE = migrated
+            _write_posted_articles(_POSTED_CACHE)
+    
+    return _POSTED_CACHE
+
+
+def compact_if_needed():
+    """Fold the append log into the JSON snapshot once it has grown large"""
+    posted = _get_posted()
+    # Compacting rewrites every entry, so only do it once the log holds at least
+    # half as many lines as the cache has entries - keeps saves amortized O(1)
+    if _POSTED_LOG_LINES > max(COMPACT_MIN_LOG_LINES, len(posted) // 2):
+        log("🗜️  Compacting posted articles log")
+        _write_posted_articles(posted)
 
 
 def save_posted_article(url, post_info):
     """Save posted article to cache"""
-    posted = load_posted_articles()
+    global _POSTED_CACHE_MTIME, _POSTED_LOG_LINES
+    
+    posted = _get_posted()
     article_hash = get_article_hash(url)
     posted[article_hash] = {
         'url': url,
@@ -74,41 +344,122 @@ def save_posted_article(url, post_info):
         'title': post_info.get('title', ''),
         'variant_used': post_info.get('variant_used', '')
     }
-    with open(POSTED_CACHE_FILE, 'w') as f:
-        json.dump(posted, f, indent=2)
+    
+    # Append one line instead of rewriting the whole history
+    line = json_dumps({'hash': article_hash, **posted[article_hash]}) + "\n"
+    with open(POSTED_LOG_FILE, 'a+b') as f:
+        # If an earlier append was cut off mid-line, start a fresh line so this
+        # record isn't glued onto the torn one and skipped on the next load
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                line = "\n" + line
+        f.write(line.encode('utf-8'))
+    _POSTED_LOG_LINES += 1
+    _POSTED_CACHE_MTIME = _posted_files_mtime()
+    
+    compact_if_needed()
 
 
-def is_already_posted(url):
-    """Check if article was already posted"""
-    posted = load_posted_articles()
-    article_hash = get_article_hash(url)
-    return article_hash in posted
+def is_already_posted(url, posted_hashes=None):
+    """Check if article was already posted (against a snapshot of hashes if given)"""
+    if posted_hashes is None:
+        posted_hashes = _get_posted()
+    return get_article_hash(url) in posted_hashes
+
+
+def load_feed_state():
+    """Load ETag/Last-Modified validators from the last fully checked feed"""
+    if FEED_STATE_FILE.exists():
+        return json_loads(FEED_STATE_FILE.read_text(encoding='utf-8'))
+    return {}
+
+
+def save_feed_state(rss_url, response):
+    """Remember the feed's validators for the next conditional GET"""
+    state = {
+        'url': rss_url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified')
+    }
+    write_file_atomic(FEED_STATE_FILE, json_dumps(state, indent=True))
+
+
+def _build_post_data(elem):
+    """Build post dict from a finished RSS <item> or Atom <entry> element"""
+    if elem.tag == 'item':
+        summary = elem.findtext('description', '')
+        return {
+            'title': elem.findtext('title') or 'Untitled',
+            'link': (elem.findtext('link') or '').strip(),
+            'published': elem.findtext('pubDate', ''),
+            'summary': summary,
+            'content': elem.findtext(RSS_CONTENT_TAG) or summary
+        }
+    
+    link = elem.find(f"{ATOM_NS}link[@rel='alternate']")
+    if link is None:
+        link = elem.find(f"{ATOM_NS}link")
+    summary = elem.findtext(f"{ATOM_NS}summary", '')
+    return {
+        'title': elem.findtext(f"{ATOM_NS}title") or 'Untitled',
+        'link': link.get('href', '') if link is not None else '',
+        'published': elem.findtext(f"{ATOM_NS}published") or elem.findtext(f"{ATOM_NS}updated", ''),
+        'summary': summary,
+        'content': elem.findtext(f"{ATOM_NS}content") or summary
+    }
+
+
+def iter_feed_entries(stream):
+    """Yield post dicts one at a time while the feed is still downloading"""
+    for _, elem in ET.iterparse(stream, events=('end',)):
+        if elem.tag in FEED_ENTRY_TAGS:
+            yield _build_post_data(elem)
+            # Free the entry subtree - we never look back at it
+            elem.clear()
 
 
 def fetch_latest_blog_post(rss_url):
     """Fetch the latest unposted blog post from RSS feed"""
     try:
         log("📡 Fetching RSS feed...")
-        feed = feedparser.parse(rss_url)
         
-        if not feed.entries:
+        # Snapshot posted hashes once so each entry is a plain set lookup
+        posted_hashes = frozenset(_get_posted())
+        found_entries = False
+        
+        # Conditional GET - an unchanged feed comes back as an empty 304
+        headers = {}
+        feed_state = load_feed_state()
+        if feed_state.get('url') == rss_url:
+            if feed_state.get('etag'):
+                headers['If-None-Match'] = feed_state['etag']
+            if feed_state.get('last_modified'):
+                headers['If-Modified-Since'] = feed_state['last_modified']
+        
+        with SESSION.get(rss_url, headers=headers, stream=True, timeout=30) as response:
+            if response.status_code == 304:
+                log("ℹ️  RSS feed unchanged since last check - no new posts")
+                return None
+            
+            response.raise_for_status()
+            response.raw.decode_content = True
+            
+            # Check each post until we find one that hasn't been posted,
+            # without parsing the rest of the feed. Validators aren't saved
+            # in that case, so a post that fails to go out is retried next run.
+            for post_data in iter_feed_entries(response.raw):
+                found_entries = True
+                if not is_already_posted(post_data['link'], posted_hashes):
+                    log(f"✅ Found new post: {post_data['title']}")
+                    return post_data
+        
+        save_feed_state(rss_url, response)
+        
+        if not found_entries:
             log("⚠️  No posts found in RSS feed")
             return None
         
-        # Check each post until we find one that hasn't been posted
-        for entry in feed.entries:
-            url = entry.get('link', '')
-            if not is_already_posted(url):
-                post_data = {
-                    'title': entry.get('title', 'Untitled'),
-                    'link': url,
-                    'published': entry.get('published', ''),
-                    'summary': entry.get('summary', ''),
-                    'content': entry.get('content', [{}])[0].get('value', entry.get('summary', ''))
-                }
-                log(f"✅ Found new post: {post_data['title']}")
-                return post_data
-        
         log("ℹ️  No new posts to share (all already posted)")
         return None
         
@@ -119,131 +470,132 @@ def fetch_latest_blog_post(rss_url):
 
 def clean_html(html_content):
     """Strip HTML tags from content"""
-    from html.parser import HTMLParser
-    
-    class HTMLStripper(HTMLParser):
-        def __init__(self):
-            super().__init__()
-            self.reset()
-            self.strict = False
-            self.convert_charrefs = True
-            self.text = []
-            
-        def handle_data(self, data):
-            self.text.append(data)
-            
-        def get_text(self):
-            return ''.join(self.text)
-    
-    stripper = HTMLStripper()
-    stripper.feed(html_content)
-    return ' '.join(stripper.get_text().split())
-
-
-def generate_linkedin_variants(blog_post):
-    """Generate 3 LinkedIn caption variants using Claude API"""
-    
-    clean_content = clean_html(blog_post['content'])
-    
-    prompt = f"""You are an expert LinkedIn content strategist for Steven, an Education Director with 25+ years in special education leadership, recently completed Ed.D., and building a Human-First AI Leadership platform.
-
-Generate 3 distinct LinkedIn caption variations for this blog post. Each should be engagement-optimized but authentic to Steven's voice.
-
-**OPTIMIZATION FRAMEWORK:**
-
-1. **Personal Story Hook** - Lead with Steven's experience
-2. **Question Pattern Interrupt** - Start with provocative question  
-3. **Contrarian/Stat Hook** - Challenge common assumption
+    text = html.unescape(_TAG_RE.sub(' ', html_content))
+    return _WS_RE.sub(' ', text).strip()
 
-**REQUIREMENTS:**
-- Hook that stops the scroll
-- Mini-insight that provides value
-- Natural flow (not salesy)
-- 3-5 strategic hashtags
-- NO link in caption (will be added in comments)
 
-**STEVEN'S VOICE:**
-- Thoughtful, authentic educator
-- Challenges conventional wisdom
-- Purpose-driven leadership focus
-- Integrates AI + human dignity
-
-**OUTPUT FORMAT (CRITICAL):**
-Return ONLY valid JSON with no markdown, no preamble, no explanation:
+def _claude_request(prompt, stream):
+    """Build headers and body for a variant-generation Messages API call"""
+    headers = {
+        'x-api-key': ANTHROPIC_API_KEY,
+        'anthropic-version': '2023-06-01',
+        'content-type': 'application/json'
+    }
+    body = {
+        'model': 'claude-sonnet-4-20250514',
+        'max_tokens': CLAUDE_MAX_TOKENS,
+        'stream': stream,
+        'system': [{
+            'type': 'text',
+            'text': VARIANT_SYSTEM_PROMPT,
+            'cache_control': {'type': 'ephemeral'}
+        }],
+        'messages': [{
+            'role': 'user',
+            'content': prompt
+        }]
+    }
+    return headers, body
 
-{{
-  "variants": [
-    {{
-      "type": "personal_story",
-      "caption": "full caption text here",
-      "hashtags": ["tag1", "tag2", "tag3"],
-      "engagement_score": 85,
-      "why_it_works": "brief explanation"
-    }},
-    {{
-      "type": "question_interrupt", 
-      "caption": "full caption text here",
-      "hashtags": ["tag1", "tag2", "tag3"],
-      "engagement_score": 90,
-      "why_it_works": "brief explanation"
-    }},
-    {{
-      "type": "contrarian_hook",
-      "caption": "full caption text here", 
-      "hashtags": ["tag1", "tag2", "tag3"],
-      "engagement_score": 88,
-      "why_it_works": "brief explanation"
-    }}
-  ]
-}}
 
----
+def call_claude(prompt):
+    """Call Claude and return (text, stop_reason) once the full response arrives"""
+    headers, body = _claude_request(prompt, stream=False)
+    response = SESSION.post(ANTHROPIC_MESSAGES_URL, headers=headers, json=body, timeout=60)
+    response.raise_for_status()
+    result = response.json()
+    return result['content'][0]['text'], result.get('stop_reason')
 
-**BLOG POST:**
 
-Title: {blog_post['title']}
-Content: {clean_content[:3000]}
-URL: {blog_post['link']}
+def call_claude_streaming(prompt):
+    """Call Claude with server-sent events and return (text, stop_reason)"""
+    headers, body = _claude_request(prompt, stream=True)
+    chunks = []
+    stop_reason = None
+    
+    with SESSION.post(ANTHROPIC_MESSAGES_URL, headers=headers, json=body,
+                      stream=True, timeout=60) as response:
+        response.raise_for_status()
+        
+        for line in response.iter_lines():
+            # Only "data:" lines carry events; "event:" lines repeat the type
+            if not line.startswith(b'data:'):
+                continue
+            event = json_loads(line[5:])
+            event_type = event.get('type')
+            
+            if event_type == 'content_block_delta' and event['delta'].get('type') == 'text_delta':
+                chunks.append(event['delta']['text'])
+            elif event_type == 'message_delta':
+                stop_reason = event['delta'].get('stop_reason')
+            elif event_type == 'message_stop':
+                break
+            elif event_type == 'error':
+                raise RuntimeError(event['error'].get('message', 'stream error'))
+        else:
+            raise RuntimeError("stream ended before message_stop")
+    
+    return ''.join(chunks), stop_reason
 
----
 
-Return ONLY the JSON object, nothing else:"""
+def generate_linkedin_variants(blog_post):
+    """Generate 3 LinkedIn caption variants using Claude API"""
+    
+    raw_content = blog_post['content'][:RAW_CONTENT_CHARS]
+    # Drop a tag cut in half by the slice so it doesn't leak into the text
+    if raw_content.rfind('<') > raw_content.rfind('>'):
+        raw_content = raw_content[:raw_content.rfind('<')]
+    clean_content = clean_html(raw_content)[:PROMPT_CONTENT_CHARS]
+    
+    # Near-duplicate posts (republished, lightly edited) reuse earlier variants
+    cache_namespace = get_article_hash(SQUARESPACE_RSS_URL)
+    embedding = None
+    if semantic_cache.EMBEDDINGS_AVAILABLE:
+        try:
+            embedding = semantic_cache.embed(f"{blog_post['title']} {clean_content[:1000]}")
+            cached = semantic_cache.lookup(cache_namespace, embedding)
+            if cached:
+                variants, similarity = cached
+                log(f"♻️  Reusing cached variants for similar post (similarity: {similarity:.2f})")
+                return variants
+        except Exception as e:
+            log(f"⚠️  Semantic cache lookup failed: {e}")
+            embedding = None
+    
+    prompt = VARIANT_USER_PROMPT_TEMPLATE.format(
+        title=blog_post['title'],
+        content=clean_content,
+        url=blog_post['link']
+    )
 
     try:
         log("🤖 Generating LinkedIn variants with Claude AI...")
         
-        response = requests.post(
-            'https://api.anthropic.com/v1/messages',
-            headers={
-                'x-api-key': ANTHROPIC_API_KEY,
-                'anthropic-version': '2023-06-01',
-                'content-type': 'application/json'
-            },
-            json={
-                'model': 'claude-sonnet-4-20250514',
-                'max_tokens': 2500,
-                'messages': [{
-                    'role': 'user',
-                    'content': prompt
-                }]
-            },
-            timeout=60
-        )
-        
-        response.raise_for_status()
-        result = response.json()
+        # Only a malformed or truncated SSE stream is worth retrying without
+        # streaming; HTTP errors (bad key, bad request) would fail again
+        try:
+            generated_text, stop_reason = call_claude_streaming(prompt)
+        except (RuntimeError, ValueError, requests.exceptions.ChunkedEncodingError) as e:
+            log(f"⚠️  Streaming response broken ({e}) - retrying without streaming")
+            generated_text, stop_reason = call_claude(prompt)
         
-        # Extract text and parse JSON
-        generated_text = result['content'][0]['text']
+        if stop_reason == 'max_tokens':
+            log(f"⚠️  Claude hit the {CLAUDE_MAX_TOKENS}-token limit - response may be truncated")
         
         # Clean up any markdown formatting
         generated_text = generated_text.replace('```json', '').replace('```', '').strip()
         
         # Parse JSON
-        variants_data = json.loads(generated_text)
+        variants_data = json_loads(generated_text)
         
         log(f"✅ Generated {len(variants_data['variants'])} variants")
         
+        if embedding is not None:
+            try:
+                semantic_cache.store(cache_namespace, embedding, variants_data['variants'])
+            except Exception as e:
+                log(f"⚠️  Could not update semantic cache: {e}")
+        
         return variants_data['variants']
         
     except json.JSONDecodeError as e:
@@ -260,29 +612,93 @@ def select_best_variant(variants):
     if not variants:
         return None
     
-    # Sort by engagement score (highest first)
-    sorted_variants = sorted(variants, key=lambda x: x.get('engagement_score', 0), reverse=True)
-    
-    best = sorted_variants[0]
+    # Highest engagement score wins (first one on ties)
+    best = max(variants, key=lambda v: v.get('engagement_score', 0))
     log(f"🎯 Selected best variant: {best['type']} (score: {best['engagement_score']})")
     log(f"   Why: {best['why_it_works']}")
     
     return best
 
 
-def post_to_linkedin(caption, hashtags, blog_url):
-    """Post to LinkedIn using browser automation"""
+def use_selenium_posting():
+    """Whether posts go through headless Chrome instead of the LinkedIn API"""
+    return not (LINKEDIN_ACCESS_TOKEN and LINKEDIN_AUTHOR_URN) and USE_SELENIUM_FALLBACK
+
+
+def post_to_linkedin(caption, hashtags, blog_url, driver_future=None):
+    """Post to LinkedIn via the API, or browser automation as a fallback"""
     
-    if not SELENIUM_AVAILABLE:
-        log("❌ Selenium not available - cannot post to LinkedIn")
-        return False
+    # Combine caption and hashtags once for whichever backend posts it
+    hashtag_str = ' '.join('#' + tag for tag in hashtags)
+    full_caption = f"{caption}\n\n{hashtag_str}"
     
-    if not LINKEDIN_EMAIL or not LINKEDIN_PASSWORD:
-        log("❌ LinkedIn credentials not configured")
+    if use_selenium_posting():
+        return post_to_linkedin_selenium(full_caption, blog_url, driver_future)
+    
+    # Not posting through Chrome - don't leave a warmed-up browser running
+    discard_driver_future(driver_future)
+    
+    if LINKEDIN_ACCESS_TOKEN and LINKEDIN_AUTHOR_URN:
+        return post_to_linkedin_api(full_caption, blog_url)
+    
+    log("❌ LinkedIn API not configured (LINKEDIN_ACCESS_TOKEN / LINKEDIN_AUTHOR_URN) "
+        "and USE_SELENIUM_FALLBACK is off")
+    return False
+
+
+def post_to_linkedin_api(full_caption, blog_url):
+    """Post to LinkedIn using the UGC Posts API"""
+    try:
+        log("🚀 Publishing post via LinkedIn API...")
+        
+        # Blog URL is attached as an article card rather than put in the caption
+        payload = {
+            'author': LINKEDIN_AUTHOR_URN,
+            'lifecycleState': 'PUBLISHED',
+            'specificContent': {
+                'com.linkedin.ugc.ShareContent': {
+                    'shareCommentary': {'text': full_caption},
+                    'shareMediaCategory': 'ARTICLE',
+                    'media': [{
+                        'status': 'READY',
+                        'originalUrl': blog_url
+                    }]
+                }
+            },
+            'visibility': {
+                'com.linkedin.ugc.MemberNetworkVisibility': 'PUBLIC'
+            }
+        }
+        
+        response = SESSION.post(
+            'https://api.linkedin.com/v2/ugcPosts',
+            headers={
+                'Authorization': f'Bearer {LINKEDIN_ACCESS_TOKEN}',
+                'X-Restli-Protocol-Version': '2.0.0'
+            },
+            json=payload,
+            timeout=30
+        )
+        response.raise_for_status()
+        
+        log(f"   ✅ Post published: {response.headers.get('x-restli-id', 'unknown id')}")
+        log("🎉 SUCCESSFULLY POSTED TO LINKEDIN!")
+        return True
+        
+    except Exception as e:
+        log(f"❌ Error posting to LinkedIn API: {e}")
         return False
+
+
+def start_linkedin_driver():
+    """Launch headless Chrome logged into LinkedIn, or return None on failure"""
+    
+    if not SELENIUM_AVAILABLE:
+        log("❌ Selenium not available - cannot post to LinkedIn")
+        return None
     
     try:
-        log("🚀 Starting LinkedIn posting process...")
+        log("🚀 Starting LinkedIn browser session...")
         
         # Setup Chrome options for headless mode (works on cloud servers)
         chrome_options = Options()
@@ -291,19 +707,44 @@ def post_to_linkedin(caption, hashtags, blog_url):
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--disable-gpu')
         chrome_options.add_argument('--window-size=1920,1080')
+        chrome_options.add_argument(f'--user-data-dir={CHROME_PROFILE_DIR}')
         
-        # Initialize driver
+        # Initialize driver - explicit waits only, implicit waits would stall
+        # every condition below that expects an element to be absent
         driver = webdriver.Chrome(options=chrome_options)
-        driver.implicitly_wait(10)
-        
+    except Exception as e:
+        log(f"❌ Error starting Chrome: {e}")
+        return None
+    
+    logged_in = False
+    try:
+        # Open the feed - the saved profile is usually still logged in
+        log("   🔐 Checking LinkedIn session...")
+        driver.get('https://www.linkedin.com/feed/')
         try:
-            # 1. Login to LinkedIn
+            WebDriverWait(driver, 10).until(EC.any_of(
+                EC.presence_of_element_located(START_POST_LOCATOR),
+                EC.url_contains('login'),
+                EC.url_contains('authwall')
+            ))
+        except TimeoutException:
+            pass  # fall through to the URL check below
+        
+        if '/feed' in driver.current_url:
+            log("   ✅ Reusing saved LinkedIn session")
+        else:
+            # Redirected to login/authwall - sign in with credentials
+            if not LINKEDIN_EMAIL or not LINKEDIN_PASSWORD:
+                log("❌ LinkedIn credentials not configured")
+                return None
+            
             log("   🔐 Logging into LinkedIn...")
             driver.get('https://www.linkedin.com/login')
-            time.sleep(2)
             
             # Enter credentials
-            email_field = driver.find_element(By.ID, 'username')
+            email_field = WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable((By.ID, 'username'))
+            )
             password_field = driver.find_element(By.ID, 'password')
             
             email_field.send_keys(LINKEDIN_EMAIL)
@@ -312,64 +753,110 @@ def post_to_linkedin(caption, hashtags, blog_url):
             # Click login
             login_button = driver.find_element(By.CSS_SELECTOR, 'button[type="submit"]')
             login_button.click()
-            time.sleep(5)
             
             # Check if login successful
-            if 'feed' not in driver.current_url and 'checkpoint' not in driver.current_url:
+            try:
+                WebDriverWait(driver, 15).until(EC.any_of(
+                    EC.url_contains('feed'),
+                    EC.url_contains('checkpoint')
+                ))
+            except TimeoutException:
                 log("❌ Login may have failed - unexpected URL")
-                return False
+                return None
             
             log("   ✅ Logged in successfully")
+        
+        logged_in = True
+        return driver
+        
+    except Exception as e:
+        log(f"❌ Error logging into LinkedIn: {e}")
+        return None
+    finally:
+        if not logged_in:
+            driver.quit()
+
+
+def discard_driver_future(driver_future):
+    """Shut down a pre-warmed browser that ended up not being used"""
+    if driver_future is None:
+        return
+    driver = driver_future.result()
+    if driver is not None:
+        driver.quit()
+
+
+def post_to_linkedin_selenium(full_caption, blog_url, driver_future=None):
+    """Post to LinkedIn using browser automation"""
+    
+    # Use the browser warmed up during variant generation if there is one
+    if driver_future is not None:
+        driver = driver_future.result()
+    else:
+        driver = start_linkedin_driver()
+    
+    if driver is None:
+        return False
+    
+    try:
+        log("🚀 Starting LinkedIn posting process...")
+        
+        try:
+            # 1. Make sure we're on the feed
+            if 'feed' not in driver.current_url:
+                driver.get('https://www.linkedin.com/feed/')
             
-            # 2. Navigate to post creation
+            # 2. Start post creation
             log("   📝 Creating post...")
-            driver.get('https://www.linkedin.com/feed/')
-            time.sleep(3)
             
             # Click "Start a post" button
             start_post = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, 'button[aria-label*="Start a post"]'))
+                EC.element_to_be_clickable(START_POST_LOCATOR)
             )
             start_post.click()
-            time.sleep(2)
             
             # 3. Write the post
             log("   ✍️  Writing caption...")
             
-            # Combine caption and hashtags
-            full_caption = f"{caption}\n\n{' '.join(['#' + tag for tag in hashtags])}"
-            
             # Find the post textarea
             post_box = WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, 'div[contenteditable="true"]'))
             )
             post_box.send_keys(full_caption)
-            time.sleep(2)
             
             # 4. Post it
             log("   🚀 Publishing post...")
-            post_button = driver.find_element(By.CSS_SELECTOR, 'button[aria-label*="Post"]')
+            post_button = WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, 'button[aria-label*="Post"]'))
+            )
             post_button.click()
-            time.sleep(5)
+            
+            # The editor is removed from the page once the post is published
+            WebDriverWait(driver, 15).until(EC.staleness_of(post_box))
             
             log("   ✅ Main post published!")
             
             # 5. Add comment with link
             log("   💬 Adding comment with blog link...")
-            time.sleep(3)
             
             # Find the comment box on the newly created post
             comment_box = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 'div[data-placeholder*="comment"]'))
+                EC.element_to_be_clickable((By.CSS_SELECTOR, 'div[data-placeholder*="comment"]'))
             )
             comment_box.click()
-            time.sleep(1)
             comment_box.send_keys(f"Read the full post: {blog_url}")
             
             # Submit comment
-            comment_button = driver.find_element(By.CSS_SELECTOR, 'button[data-control-name*="comment"]')
+            comment_button = WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, 'button[data-control-name*="comment"]'))
+            )
             comment_button.click()
-            time.sleep(3)
+            
+            # The box is cleared (or re-rendered) once the comment is submitted
+            WebDriverWait(driver, 10).until(EC.any_of(
+                EC.staleness_of(comment_box),
+                lambda d: not comment_box.text.strip()
+            ))
             
             log("   ✅ Comment with link posted!")
             log("🎉 SUCCESSFULLY POSTED TO LINKEDIN!")
@@ -408,29 +895,46 @@ def main():
         log("✅ No action needed - will check again on next run")
         return
     
-    # Step 2: Generate LinkedIn variants
-    log("\n🤖 Step 2: Generating optimized LinkedIn captions...")
-    variants = generate_linkedin_variants(blog_post)
-    
-    if not variants:
-        log("❌ Failed to generate variants")
-        return
-    
-    # Step 3: Select best variant
-    log("\n🎯 Step 3: Selecting best variant with AI...")
-    best_variant = select_best_variant(variants)
-    
-    if not best_variant:
-        log("❌ Failed to select variant")
-        return
+    # Chrome startup and login don't depend on the caption, so warm the
+    # browser up in the background while Claude generates variants
+    driver_future = None
+    if use_selenium_posting():
+        executor = ThreadPoolExecutor(max_workers=1)
+        driver_future = executor.submit(start_linkedin_driver)
+        executor.shutdown(wait=False)
     
-    # Step 4: Post to LinkedIn
-    log("\n📤 Step 4: Posting to LinkedIn...")
-    success = post_to_linkedin(
-        caption=best_variant['caption'],
-        hashtags=best_variant['hashtags'],
-        blog_url=blog_post['link']
-    )
+    # Until post_to_linkedin takes the warmed browser, any exit - including an
+    # exception from a malformed variant - must quit it, or Chrome keeps the
+    # profile directory locked for every later run
+    try:
+        # Step 2: Generate LinkedIn variants
+        log("\n🤖 Step 2: Generating optimized LinkedIn captions...")
+        variants = generate_linkedin_variants(blog_post)
+        
+        if not variants:
+            log("❌ Failed to generate variants")
+            return
+        
+        # Step 3: Select best variant
+        log("\n🎯 Step 3: Selecting best variant with AI...")
+        best_variant = select_best_variant(variants)
+        
+        if not best_variant:
+            log("❌ Failed to select variant")
+            return
+        
+        # Step 4: Post to LinkedIn
+        log("\n📤 Step 4: Posting to LinkedIn...")
+        success = post_to_linkedin(
+            caption=best_variant['caption'],
+            hashtags=best_variant['hashtags'],
+            blog_url=blog_post['link'],
+            driver_future=driver_future
+        )
+        # Once it returns, post_to_linkedin has quit or discarded the browser
+        driver_future = None
+    finally:
+        discard_driver_future(driver_future)
     
     if success:
         # Step 5: Save to posted cache
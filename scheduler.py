@@ -5,35 +5,43 @@ This is what Railway will execute continuously
 """
 
 import time
-import subprocess
+import signal
 from datetime import datetime
 
+from linkedin_auto_poster import main as run_once
+
+RUN_TIMEOUT = 300  # 5 minute timeout
+
+class RunTimeout(BaseException):
+    """Raised by SIGALRM when a run overruns RUN_TIMEOUT.
+
+    Derives from BaseException so the auto-poster's `except Exception`
+    handlers can't swallow it; their `finally` blocks (e.g. driver.quit)
+    still run on the way out.
+    """
+
+def _on_timeout(signum, frame):
+    raise RunTimeout()
+
 def log(message):
     print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}")
 
 def run_autoposter():
-    """Execute the auto-poster script"""
+    """Run the auto-poster in-process, aborting it after RUN_TIMEOUT seconds"""
     try:
         log("🔄 Running LinkedIn auto-poster...")
-        result = subprocess.run(
-            ['python', 'linkedin_auto_poster.py'],
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
-        )
-        
-        # Print output
-        if result.stdout:
-            print(result.stdout)
-        if result.stderr:
-            print(result.stderr)
-            
-        if result.returncode == 0:
-            log("✅ Auto-poster completed successfully")
-        else:
-            log(f"⚠️  Auto-poster exited with code {result.returncode}")
-            
-    except subprocess.TimeoutExpired:
+
+        # SIGALRM is delivered to the main thread, so run_once must run here
+        signal.signal(signal.SIGALRM, _on_timeout)
+        signal.alarm(RUN_TIMEOUT)
+        try:
+            run_once()
+        finally:
+            signal.alarm(0)
+
+        log("✅ Auto-poster completed successfully")
+
+    except RunTimeout:
         log("⏱️  Auto-poster timed out after 5 minutes")
     except Exception as e:
         log(f"❌ Error running auto-poster: {e}")
@@ -41,10 +49,10 @@ def run_autoposter():
 def main():
     """Run auto-poster every hour"""
     log("🚀 Scheduler started - will check for new posts every hour")
-    
+
     while True:
         run_autoposter()
-        
+
         # Wait 1 hour before next check
         log("⏳ Sleeping for 1 hour until next check...")
         time.sleep(3600)  # 3600 seconds = 1 hour
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Semantic Cache - Reuses generated LinkedIn variants for near-duplicate posts
+Embeds blog text locally and stores variants in SQLite, so republished or
+lightly edited posts skip the Claude round-trip.
+"""
+
+import json
+import math
+import sqlite3
+import time
+from array import array
+from contextlib import closing
+from pathlib import Path
+
+# Local ONNX embeddings - avoids pulling in torch/sentence-transformers
+try:
+    from fastembed import TextEmbedding
+    EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    EMBEDDINGS_AVAILABLE = False
+
+CACHE_DB_FILE = Path("semantic_cache.db")
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+SIMILARITY_THRESHOLD = 0.92
+CACHE_TTL_SECONDS = 7 * 24 * 3600  # 7 days
+
+_model = None
+
+
+def _get_model():
+    """Load the embedding model once per process"""
+    global _model
+    if _model is None:
+        _model = TextEmbedding(EMBEDDING_MODEL)
+    return _model
+
+
+def _open_connection():
+    """Open a short-lived cache connection - callers may run on different threads"""
+    conn = sqlite3.connect(CACHE_DB_FILE)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS variant_cache (
+            id INTEGER PRIMARY KEY,
+            namespace TEXT NOT NULL,
+            embedding BLOB NOT NULL,
+            variants_json TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+    """)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_variant_cache_namespace ON variant_cache (namespace)"
+    )
+    return conn
+
+
+def embed(text):
+    """Return a unit-length embedding for text"""
+    vector = next(iter(_get_model().embed([text])))
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return array('f', (x / norm for x in vector))
+
+
+def lookup(namespace, embedding):
+    """Return (variants, similarity) for the closest cached post, or None below threshold"""
+    with closing(_open_connection()) as conn, conn:
+        conn.execute(
+            "DELETE FROM variant_cache WHERE created_at < ?",
+            (time.time() - CACHE_TTL_SECONDS,)
+        )
+        rows = conn.execute(
+            "SELECT embedding, variants_json FROM variant_cache WHERE namespace = ?",
+            (namespace,)
+        ).fetchall()
+
+    best_score, best_json = 0.0, None
+    for blob, variants_json in rows:
+        cached = array('f')
+        cached.frombytes(blob)
+        # Both vectors are unit length, so the dot product is the cosine similarity
+        score = sum(a * b for a, b in zip(embedding, cached))
+        if score > best_score:
+            best_score, best_json = score, variants_json
+
+    if best_json is None or best_score < SIMILARITY_THRESHOLD:
+        return None
+    return json.loads(best_json), best_score
+
+
+def store(namespace, embedding, variants):
+    """Cache generated variants under the given embedding"""
+    with closing(_open_connection()) as conn, conn:
+        conn.execute(
+            "INSERT INTO variant_cache (namespace, embedding, variants_json, created_at) VALUES (?, ?, ?, ?)",
+            (namespace, embedding.tobytes(), json.dumps(variants), time.time())
+        )